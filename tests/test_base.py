@@ -0,0 +1,41 @@
+""" tests of ztfimg.base """
+import numpy as np
+import pytest
+from astropy.io import fits
+
+# ztfimg imports ztfimg.raw that needs ztfsensors
+pytest.importorskip("ztfsensors")
+from ztfimg.base import Quadrant
+
+
+def test_read_data_scaled(tmp_path):
+    """ scaled (BZERO) images cannot be memory mapped but must be read """
+    data = np.arange(np.prod(Quadrant.SHAPE), dtype="uint16").reshape(Quadrant.SHAPE)
+    filepath = str(tmp_path / "scaled.fits")
+    fits.PrimaryHDU(data).writeto(filepath)
+    assert fits.getheader(filepath)["BZERO"] == 32768
+
+    for use_dask in [False, True]:
+        read = np.asarray(Quadrant._read_data(filepath, use_dask=use_dask))
+        np.testing.assert_array_equal(read, data)
+
+
+def test_rebinned_data_inplace():
+    """ modifying rebinned data inplace does not affect the image """
+    data = np.random.default_rng(0).normal(size=Quadrant.SHAPE).astype("float32")
+    quadrant = Quadrant.from_data(data)
+    rebinned = quadrant.get_data(rebin=4)
+    reference = rebinned.copy()
+    rebinned -= 10
+    np.testing.assert_array_equal(quadrant.get_data(rebin=4), reference)
+    quadrant.get_data(rebin=4)[:] = np.nan
+    np.testing.assert_array_equal(quadrant.get_data(rebin=4), reference)
+
+
+def test_rebin_chunks():
+    """ default dask chunks are the same size and rebinnable by 2, 4 and 8 """
+    from ztfimg.utils.tools import get_rebin_chunks
+    for shape in [Quadrant.SHAPE, (2*Quadrant.SHAPE[0], 2*Quadrant.SHAPE[1])]:
+        chunks = get_rebin_chunks(shape)
+        assert all(size % chunk == 0 and chunk % 8 == 0 and size // chunk >= 4
+                   for size, chunk in zip(shape, chunks))
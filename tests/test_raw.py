@@ -0,0 +1,130 @@
+""" tests of ztfimg.raw on small synthetic raw files """
+import os
+import numpy as np
+import pytest
+from astropy.io import fits
+
+pytest.importorskip("ztfsensors")
+from ztfimg import base, raw
+
+SHAPE = (40, 32)
+SHAPE_OVERSCAN = (40, 30)
+IMGKEYS = dict(EXPTIME=30., IMGTYPE="object", PIXSCALE=1.01, THETA_X=0.1, THETA_Y=0.2,
+               INST_ROT=0.3, FILTER="ZTF_r", OBSJD=2459000.5, RAD=10., DECD=20.,
+               TELRA=10., TELDEC=20., AZIMUTH=3., ELVATION=60.)
+
+
+@pytest.fixture(autouse=True)
+def small_shapes(monkeypatch):
+    """ raw images shrunk to SHAPE (quadrant) """
+    monkeypatch.setattr(base.Quadrant, "SHAPE", SHAPE)
+    monkeypatch.setattr(base.CCD, "SHAPE", (2*SHAPE[0], 2*SHAPE[1]))
+    monkeypatch.setattr(raw.RawQuadrant, "SHAPE_OVERSCAN", SHAPE_OVERSCAN)
+
+
+def make_rawfile(dirpath, ccdid=5, compressed=False, seed=0):
+    """ raw ccd file with uint16 data (stored scaled, BZERO=32768) like funpacked raw files """
+    rng = np.random.default_rng(seed)
+    suffix = "fits.fz" if compressed else "fits"
+    filepath = str(dirpath / f"ztf_20200101123456_000600_zr_c{ccdid:02d}_o.{suffix}")
+    hdus = [fits.PrimaryHDU(header=fits.Header(list(IMGKEYS.items())))]
+    imagehdu = fits.CompImageHDU if compressed else fits.ImageHDU
+    for qid in range(1, 5):
+        header = fits.Header([("CCD_ID", ccdid), ("AMP_ID", qid-1), ("GAIN", 6.2)])
+        data = rng.normal(1000, 20, size=SHAPE) + np.arange(SHAPE[0])[:, None]*qid
+        hdus.append(imagehdu(data.astype("uint16"), header=header))
+    for qid in range(1, 5):
+        overscan = rng.normal(500, 5, size=SHAPE_OVERSCAN) + np.arange(SHAPE_OVERSCAN[1])
+        hdus.append(imagehdu(overscan.astype("uint16")))
+
+    fits.HDUList(hdus).writeto(filepath)
+    return filepath
+
+
+@pytest.mark.parametrize("qid", [1, 2, 3, 4])
+def test_quadrant_from_scaled_file(tmp_path, qid):
+    """ uncompressed BZERO raw files cannot be memory mapped but must be read """
+    filepath = make_rawfile(tmp_path)
+    assert fits.getheader(filepath, ext=qid)["BZERO"] == 32768
+
+    quadrant = raw.RawQuadrant.from_filename(filepath, qid=qid)
+    np.testing.assert_array_equal(quadrant.data, fits.getdata(filepath, ext=qid))
+    np.testing.assert_array_equal(quadrant.overscan, fits.getdata(filepath, ext=qid+4))
+
+
+def test_ccd_from_scaled_file(tmp_path):
+    """ same as test_quadrant_from_scaled_file for the 4 quadrants at once """
+    filepath = make_rawfile(tmp_path)
+    ccd = raw.RawCCD.from_filename(filepath)
+    for qid in [1, 2, 3, 4]:
+        np.testing.assert_array_equal(ccd.get_quadrant(qid).data,
+                                      fits.getdata(filepath, ext=qid))
+
+
+def test_focalplane_processes_compressed(tmp_path):
+    """ ccds loaded in a pool of processes from compressed files """
+    filepaths = [make_rawfile(tmp_path, ccdid=ccdid, compressed=True, seed=ccdid)
+                 for ccdid in [5, 6]]
+    focalplane = raw.RawFocalPlane.from_filenames(filepaths, scheduler="processes")
+    reference = raw.RawFocalPlane.from_filenames(filepaths)
+    for ccdid in [5, 6]:
+        np.testing.assert_array_equal(focalplane.ccds[ccdid].get_data(),
+                                      reference.ccds[ccdid].get_data())
+        assert focalplane.ccds[ccdid].get_quadrant(1).header["GAIN"] == 6.2
+
+
+@pytest.mark.parametrize("corrections", [dict(corr_nl=True),
+                                         dict(corr_overscan=True),
+                                         dict(corr_nl=True, corr_overscan=True)])
+def test_get_data_numpy_dask(tmp_path, corrections):
+    """ corrected uint16 data are the same (float32) with and without dask """
+    filepath = make_rawfile(tmp_path)
+    for qid in [1, 2, 3, 4]:
+        data = raw.RawQuadrant.from_filename(filepath, qid=qid).get_data(**corrections)
+        data_dask = raw.RawQuadrant.from_filename(filepath, qid=qid,
+                                                  use_dask=True).get_data(**corrections).compute()
+        assert data.dtype == data_dask.dtype == "float32"
+        np.testing.assert_array_equal(data, data_dask)
+
+
+def test_overscan_cache(tmp_path, monkeypatch):
+    """ cached overscans are stored in the cache directory and follow file changes """
+    cachedir = tmp_path / "cache"
+    monkeypatch.setenv("ZTFIMG_OVERSCAN_CACHE", str(cachedir))
+    rawdir = tmp_path / "raw"
+    rawdir.mkdir()
+    filepath = make_rawfile(rawdir)
+    overscan = raw.RawQuadrant.from_filename(filepath, qid=2).overscan
+    assert len(list(cachedir.glob("*.npy"))) == 1
+    assert sorted(p.name for p in rawdir.iterdir()) == [filepath.split("/")[-1]]
+    np.testing.assert_array_equal(raw.RawQuadrant.from_filename(filepath, qid=2).overscan,
+                                  overscan)
+
+    # file replaced -> new overscan
+    os.remove(filepath)
+    filepath = make_rawfile(rawdir, seed=1)
+    os.utime(filepath, ns=(1, 1))
+    np.testing.assert_array_equal(raw.RawQuadrant.from_filename(filepath, qid=2).overscan,
+                                  fits.getdata(filepath, ext=6))
+
+
+def test_from_filefracday_cache(tmp_path, monkeypatch):
+    """ instances are only shared when cached and loaded with the same options """
+    filepaths = [make_rawfile(tmp_path, ccdid=ccdid, seed=ccdid) for ccdid in [5, 6]]
+    monkeypatch.setattr(raw, "_filefracday_to_local_rawdata", lambda *args, **kwargs: filepaths)
+    with pytest.warns(UserWarning, match="Less than 16"):
+        focalplane = raw.RawFocalPlane.from_filefracday("20200101123456", use_dask=False)
+        assert raw.RawFocalPlane.from_filefracday("20200101123456", use_dask=False) is not focalplane
+
+        cached = raw.RawFocalPlane.from_filefracday("20200101123456", use_dask=False, cache=True)
+        assert raw.RawFocalPlane.from_filefracday("20200101123456", use_dask=False,
+                                                  cache=True) is cached
+        cached_dask = raw.RawFocalPlane.from_filefracday("20200101123456", use_dask=True,
+                                                         cache=True)
+        cached_scheduler = raw.RawFocalPlane.from_filefracday("20200101123456", use_dask=False,
+                                                              cache=True, scheduler="processes")
+
+    assert len({id(cached), id(cached_dask), id(cached_scheduler)}) == 3
+    cached.ccds[5].get_quadrant(1).set_data(np.zeros(SHAPE, dtype="float32"))
+    for other in [focalplane, cached_dask, cached_scheduler]:
+        assert np.asarray(other.ccds[5].get_quadrant(1).get_data()).any()
@@ -5,12 +5,42 @@ import dask
 import dask.array as da
 import dask.dataframe as dd
 
-from .utils.tools import rebin_arr, parse_vmin_vmax, ccdid_qid_to_rcid, rcid_to_ccdid_qid
+from .utils.tools import rebin_reduce, get_rebin_chunks, parse_vmin_vmax, ccdid_qid_to_rcid, rcid_to_ccdid_qid, _DASK_TYPES
 from .utils.decorators import classproperty
 
 __all__ = ["Image", "Quadrant", "CCD", "FocalPlane"]
 
 
+def _thread_map(func, iterable, max_workers=16):
+    """ list(map(func, iterable)) using a pool of threads.
+
+    Meant for I/O bound calls (e.g. reading fits files).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    iterable = list(iterable)
+    if len(iterable) <= 1:
+        return list(map(func, iterable))
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(iterable))) as executor:
+        return list(executor.map(func, iterable))
+
+def _process_map(func, iterable, max_workers=16):
+    """ list(map(func, iterable)) using a pool of processes.
+
+    Meant for CPU bound calls (e.g. decompressing fits files).
+    func must be picklable (module level function or functools.partial of it).
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    iterable = list(iterable)
+    if len(iterable) <= 1:
+        return list(map(func, iterable))
+
+    max_workers = min(max_workers, len(iterable), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, iterable))
+
+
 def read_header(filepath, ext=None, use_dask=False, persist=False):
     """ reads the file header while handling serialization issues.
 
@@ -65,17 +95,29 @@ class Image( object ):
             self.set_header(header)
 
     @classmethod
-    def _read_data(cls, filepath, use_dask=False, persist=False, ext=None):
-        """ assuming fits format."""
+    def _read_data(cls, filepath, use_dask=False, persist=False, ext=None,
+                   dtype="float32", chunks=None):
+        """ assuming fits format.
+
+        data are memory mapped by astropy when the format allows it (not scaled)
+        and returned with their native (on disk) dtype.
+        dtype is the dask meta information and chunks the dask chunks
+        (get_rebin_chunks(SHAPE) if None) ; both ignored if not use_dask.
+        """
         from astropy.io.fits import getdata
 
-        if "dask" in str( type(filepath) ):
+        if isinstance(filepath, _DASK_TYPES):
             use_dask = True
     
         if use_dask:
             # - Data
             data = da.from_delayed( dask.delayed( getdata) (filepath, ext=ext),
-                                   shape=cls.SHAPE, dtype="float32")
+                                   shape=cls.SHAPE, dtype=dtype)
+            # same size chunks, multiple of 8, so they stay aligned once
+            # concatenated and when rebinned by 2, 4 or 8.
+            if chunks is None:
+                chunks = get_rebin_chunks(cls.SHAPE)
+            data = data.rechunk(chunks)
             if persist:
                 data = data.persist()
 
@@ -87,7 +129,7 @@ class Image( object ):
     @staticmethod
     def _read_header(filepath, use_dask=False, persist=False, ext=None):
         """ assuming fits format. """
-        if "dask" in str( type(filepath) ):
+        if isinstance(filepath, _DASK_TYPES):
             use_dask = True
 
         header = read_header(filepath, use_dask=use_dask, persist=persist, ext=ext)            
@@ -138,6 +180,21 @@ class Image( object ):
             filename  = io.get_file(filename, **prop)
 
         return filename
+
+    @staticmethod
+    def _get_filepaths(filenames, as_path=True):
+        """ list version of _get_filepath() resolving (and downloading if needed)
+        all the files with a single ztfquery.get_file() call.
+
+        Returns
+        -------
+        list of filepath
+        """
+        if as_path:
+            return list(filenames)
+
+        from ztfquery import io
+        return list(io.get_file(list(filenames), show_progress=False, squeeze=False))
     
     @classmethod
     def from_filename(cls, filename,
@@ -275,7 +332,7 @@ class Image( object ):
             raise ValueError(f"shape of the input CCD data must be {self.shape} ; {dshape} given")
 
         # Check dask compatibility
-        used_dask = "dask" in str(type(data))
+        used_dask = isinstance(data, _DASK_TYPES)
         if self.use_dask is not None and used_dask != self.use_dask:
             warnings.warn(f"Input data and self.use_dask are not compatible. Now: use_dask={used_dask}")
             
@@ -334,19 +391,19 @@ class Image( object ):
                 if data == "data":
                     data_ = self.data#.copy()
                 elif hasattr(self, data):
-                    data_ = npda.ones(self.shape) * getattr(self, data)
+                    data_ = npda.full(self.shape, getattr(self, data), dtype="float32")
                 else:
                     raise ValueError(
                         f"value as string can only be 'data' or a known attribute ; {data} given")
                 
-            elif type(data) in [int, float]:
-                data_ = npda.ones(self.shape) * data
+            elif isinstance(data, (int, float)):
+                data_ = npda.full(self.shape, data, dtype="float32")
             else:
                 data_ = data#.copy()
 
         if rebin is not None:
-            data_ = getattr(npda, rebin_stat)(
-                rebin_arr(data_, (rebin, rebin), use_dask=self._use_dask), axis=(-2, -1))
+            data_ = rebin_reduce(data_, (rebin, rebin), stat=rebin_stat,
+                                 use_dask=self._use_dask)
 
         return data_
 
@@ -361,7 +418,7 @@ class Image( object ):
             if compute is needed, this returns a pandas.Series
             for serialization issues
         """
-        if "dask" in str( type( self.header) ) and compute:
+        if isinstance(self.header, _DASK_TYPES) and compute:
             return self.header.compute()
         
         return self.header
@@ -505,7 +562,7 @@ class Image( object ):
                      bkgann=None, subpix=0,
                      use_dask=None,
                      err=None, mask=None,
-                     as_dataframe=False,
+                     as_dataframe=False, out=None,
                      **kwargs):
         """  get the apeture photometry, base on `sep.sum_circle()`
         = Internal method = 
@@ -544,6 +601,11 @@ class Image( object ):
             3xn-radius columns (f_0...f_i, f_0_e..f_i_e, f_0_f...f_i_f)
             standing for fluxes, errors, flags.
 
+        out: array, None
+            = numpy only =
+            preallocated (3, nradius, nsources) array filled with the results
+            (e.g. when looping over images with the same sources).
+
         Returns
         -------
         (3, n) array or `pandas.DataFrame`
@@ -553,29 +615,30 @@ class Image( object ):
         from .utils.tools import get_aperture
 
         if use_dask is None:
-            use_dask = "dask" in str( type(data) )
+            use_dask = isinstance(data, _DASK_TYPES)
 
         apdata = get_aperture(data,
                               x, y, radius=radius,
                               err=err, mask=mask, bkgann=bkgann,
-                              use_dask=use_dask, **kwargs)
+                              use_dask=use_dask, out=out, **kwargs)
         
         if not as_dataframe:
             return apdata
 
         # Generic form works for dask and np arrays
         nradius = len(radius)
-        dic = {**{f'f_{k}': apdata[0, k] for k in range(nradius)},
-               **{f'f_{k}_e': apdata[1, k] for k in range(nradius)},
-               # for each radius there is a flag
-               **{f'f_{k}_f': apdata[2, k] for k in range(nradius)},
-               }
-
-        if "dask" in str(type(apdata)):
-            return dd.from_dask_array(da.stack(dic.values(), allow_unknown_chunksizes=True).T,
-                                      columns=dic.keys())
+        columns = [f'f_{k}' for k in range(nradius)] + \
+                  [f'f_{k}_e' for k in range(nradius)] + \
+                  [f'f_{k}_f' for k in range(nradius)] # for each radius there is a flag
+        
+        # (3, nradius, nsources) -> (nsources, 3*nradius) following columns.
+        if isinstance(apdata, _DASK_TYPES):
+            # the number of sources may be unknown (delayed): no reshape.
+            apdata = da.stack([apdata[i, k] for i in range(3) for k in range(nradius)],
+                              allow_unknown_chunksizes=True).T
+            return dd.from_dask_array(apdata, columns=columns)
 
-        return pandas.DataFrame(dic)
+        return pandas.DataFrame(apdata.reshape(3*nradius, -1).T, columns=columns)
         
     # -------- #
     # PLOTTER  #
@@ -583,7 +646,7 @@ class Image( object ):
     def show(self, ax=None, colorbar=True, cax=None, apply=None,
                  data=None,
                  vmin="1", vmax="99",
-                 rebin=None,
+                 rebin=None, dtype="float32",
                  savefile=None,
                  dpi=150,  **kwargs):
         """ Show the image data (imshow)
@@ -617,6 +680,10 @@ class Image( object ):
         rebin: int, None
             by how much should the data be rebinned when accessed ?
             (see details in get_data())
+
+        dtype: str, None
+            data are cast to this dtype prior plotting 
+            (before computing dask data). None means no change.
             
         savefile: str, None
             if you want to save the plot, provide here the path for that.
@@ -643,8 +710,11 @@ class Image( object ):
 
         if data is None:
             data = self.get_data(rebin=rebin)
+
+        if dtype is not None: # float32 is enough for plotting
+            data = data.astype(dtype, copy=False)
             
-        if "dask" in str( type(data) ):
+        if isinstance(data, _DASK_TYPES):
             data = data.compute()
 
         if apply is not None:
@@ -761,7 +831,11 @@ class _Collection_( object ):
             COLLECTION_OF = cls._guess_filenames_imgtype_(filenames)
         
         # dask is called inside this.
-        images = [COLLECTION_OF.from_filename(filename, **prop) for filename in filenames]
+        if use_dask:
+            images = [COLLECTION_OF.from_filename(filename, **prop) for filename in filenames]
+        else: # files are read, do it in parallel
+            images = _thread_map(lambda filename: COLLECTION_OF.from_filename(filename, **prop),
+                                 filenames)
         if use_dask and persist:
             images = [i.persist() for i in images]
             
@@ -801,7 +875,7 @@ class _Collection_( object ):
         """ get a stack of the data from get_data collection of """
         datas = self._call_down(calling, **kwargs)
         # This rest assumes all datas types match.
-        use_dask = "dask" in str( type(datas[0]) )
+        use_dask = isinstance(datas[0], _DASK_TYPES)
         if use_dask:
             if type( datas[0] ) != da.Array: # Dask delayed
                 datas = [da.from_delayed(f_, shape=self._COLLECTION_OF.shape,
@@ -1100,7 +1174,7 @@ class Quadrant(Image):
         get_catalog: get a catalog for this instance.
         """
         # is catalog dasked ?
-        dasked_cat = "dask" in str( type(cat) )
+        dasked_cat = isinstance(cat, _DASK_TYPES)
         
         # Adding x, y coordinates
         # convertion available ?
@@ -1112,7 +1186,7 @@ class Quadrant(Image):
                 x = da.from_delayed(x_y[0], shape=(cat[ra].values.size,), dtype="float32" )
                 y = da.from_delayed(x_y[1], shape=(cat[ra].values.size,), dtype="float32" )
             else:
-                x, y = transfunc(*cat[[ra, dec]].values.T, reorder=reorder)
+                x, y = transfunc(*cat[[ra, dec]].to_numpy(dtype="float64").T, reorder=reorder)
         else:
             if dasked_cat:
                 x, y = da.NaN, da.NaN
@@ -1286,7 +1360,7 @@ class Quadrant(Image):
         """ returns the name of all dasked attributes """
         to_be_check = ["_data", "_mask", "_filepath", "_header"]
         return [attr for attr in to_be_check
-                    if hasattr(self, attr) and  "dask" in str( type( getattr(self, attr) ) )]
+                    if hasattr(self, attr) and  isinstance(getattr(self, attr), _DASK_TYPES)]
         
     # =============== #
     #  Properties     #
@@ -1647,8 +1721,9 @@ class CCD( Image, _Collection_):
  
         """
         self._meta = None
+        self._all_quadrants_loaded = None
         # dasked quadrants
-        if "dask" in str( type(quadrant) ):
+        if isinstance(quadrant, _DASK_TYPES):
             self._use_dask = True
             self.quadrants[qid] = quadrant
             
@@ -1810,9 +1885,8 @@ class CCD( Image, _Collection_):
             
             if rebin is not None:
                 npda = da if self.use_dask else np
-                qdata = getattr(npda, rebin_stat)(rebin_arr(qdata, (rebin, rebin),
-                                                        use_dask=self.use_dask),
-                                              axis=(-2, -1))
+                qdata = rebin_reduce(npda.stack(qdata), (rebin, rebin), stat=rebin_stat,
+                                     use_dask=self.use_dask)
         return qdata
         
     def get_data(self, rebin=None, rebin_quadrant=None,
@@ -1846,7 +1920,7 @@ class CCD( Image, _Collection_):
 
         rebuild: bool
             if self.data exist and rebin_quadrant is None, then 
-            ``self.data.copy()`` will be used. If rebuild=True, 
+            ``self.data`` will be used (not a copy). If rebuild=True, 
             then this will be re-build the data and ignore self.data
 
         persist: bool
@@ -1874,6 +1948,10 @@ class CCD( Image, _Collection_):
             data_ = self.data#.copy()
         else:
             data_ = self._quadrantdata_to_ccddata(rebin_quadrant=rebin_quadrant, **kwargs)
+
+        if rebin is not None:
+            data_ = rebin_reduce(data_, (rebin, rebin), stat=rebin_stat,
+                                 use_dask=self.use_dask)
            
         if self.use_dask and persist:
             data_ = data_.persist()
@@ -2007,9 +2085,18 @@ class CCD( Image, _Collection_):
         # ccd structure
         # q2 | q1
         # q3 | q4
-        ccd_up = npda.concatenate([qdata[1], qdata[0]], axis=1)
-        ccd_down = npda.concatenate([qdata[2], qdata[3]], axis=1)
-        ccd = npda.concatenate([ccd_down, ccd_up], axis=0)
+        # (lines are stored bottom-up: q3|q4 first)
+        if self.use_dask:
+            return da.block([[qdata[2], qdata[3]],
+                             [qdata[1], qdata[0]]])
+        
+        # single allocation, quadrants copied in place
+        (h, w) = np.shape(qdata[0])[-2:]
+        ccd = np.empty((2*h, 2*w), dtype=np.result_type(*qdata))
+        ccd[:h, :w] = qdata[2]
+        ccd[:h, w:] = qdata[3]
+        ccd[h:, :w] = qdata[1]
+        ccd[h:, w:] = qdata[0]
         return ccd
 
     def add_coord_to_catalog(self, cat, coord='ij', ra="ra", dec="dec", reorder=True, in_fov=False):
@@ -2052,7 +2139,7 @@ class CCD( Image, _Collection_):
         get_catalog: get a catalog for this instance.
         """
         # is catalog dasked ?
-        dasked_cat = "dask" in str( type(cat) )
+        dasked_cat = isinstance(cat, _DASK_TYPES)
         
         # Adding x, y coordinates
         # convertion available ?
@@ -2064,7 +2151,7 @@ class CCD( Image, _Collection_):
                 x = da.from_delayed(x_y[0], shape=(cat[ra].values.size,), dtype="float32" )
                 y = da.from_delayed(x_y[1], shape=(cat[ra].values.size,), dtype="float32" )
             else:
-                x, y = transfunc(*cat[[ra, dec]].values.T, reorder=reorder)
+                x, y = transfunc(*cat[[ra, dec]].to_numpy(dtype="float64").T, reorder=reorder)
         else:
             if dasked_cat:
                 x, y = da.NaN, da.NaN
@@ -2232,8 +2319,12 @@ class CCD( Image, _Collection_):
     
     def has_quadrants(self, logic="all"):
         """ are (all/any, see option) quadrant loaded ? """
-        is_none = [v is not None for v in self.quadrants.values()]
-        return getattr(np, logic)(is_none)
+        if logic == "all": # cached, reset by set_quadrant
+            if getattr(self, "_all_quadrants_loaded", None) is None:
+                self._all_quadrants_loaded = all(v is not None for v in self.quadrants.values())
+            return self._all_quadrants_loaded
+        
+        return getattr(np, logic)([v is not None for v in self.quadrants.values()])
 
     @classproperty
     def qshape(cls):
@@ -2292,6 +2383,11 @@ class FocalPlane(Image, _Collection_):
     _COLLECTION_OF = CCD
     # Family
     _CCDCLASS = "CCD"
+    # ccdid position in the mosaic (see get_data)
+    _CCD_LAYOUT = [[4, 3, 2, 1],
+                   [8, 7, 6, 5],
+                   [12, 11, 10, 9],
+                   [16, 15, 14, 13]]
     
     # Basically a CCD collection
     def __init__(self, ccds=None, ccdids=None,
@@ -2354,23 +2450,28 @@ class FocalPlane(Image, _Collection_):
         if rcids is None:
             rcids = np.arange(0, 64)
 
+        from .utils.tools import _RCID_TO_CCDID, _RCID_TO_QID
+        
         data = pandas.DataFrame({"path": filenames, "rcid": rcids})
         #Get the qid and ccdid associated to the rcid
-        data = data.merge(pandas.DataFrame(data["rcid"].apply(rcid_to_ccdid_qid).tolist(),
-                                           columns=["ccdid", "qid"]),
-                          left_index=True, right_index=True)
+        rcids_ = data["rcid"].to_numpy(dtype="int")
+        data["ccdid"] = _RCID_TO_CCDID[rcids_]
+        data["qid"] = _RCID_TO_QID[rcids_]
         # Get the ccdid list sorted by qid 1->4
         ccdidlist = data.sort_values("qid").groupby("ccdid")[
                                      "path"].apply(list)
 
-        ccds, filenames = cls._read_filenames(ccdidlist.values, as_path=as_path,
-                                                 use_dask=use_dask, persist=persist, **kwargs)
-        ccds = [cls._ccdclass.from_filenames(qfiles, qids=[1, 2, 3, 4], as_path=as_path,
-                                                 use_dask=use_dask, persist=persist, **kwargs)
-                for qfiles in ccdidlist.values]
+        prop = dict(qids=[1, 2, 3, 4], as_path=as_path,
+                    use_dask=use_dask, persist=persist, **kwargs)
+        if use_dask:
+            ccds = [cls._ccdclass.from_filenames(qfiles, **prop)
+                    for qfiles in ccdidlist.values]
+        else: # files are read, do it in parallel
+            ccds = _thread_map(lambda qfiles: cls._ccdclass.from_filenames(qfiles, **prop),
+                               ccdidlist.values)
             
-        return cls(ccds, np.asarray(ccdidlist.index, dtype="int"),
-                   use_dask=use_dask)
+        # use_dask is determined by the ccds data (np or da ?)
+        return cls(ccds, np.asarray(ccdidlist.index, dtype="int"))
 
     @classmethod
     def from_single_filename(cls, filename, as_path=True, use_dask=False,
@@ -2435,7 +2536,8 @@ class FocalPlane(Image, _Collection_):
         """
 
         self._meta = None
-        if "dask" in str( type(ccd) ):
+        self._all_ccds_loaded = None
+        if isinstance(ccd, _DASK_TYPES):
             self._use_dask = True
             self.ccds[ccdid] = ccd
             
@@ -2502,6 +2604,49 @@ class FocalPlane(Image, _Collection_):
         return [getattr(q, what)
                     for ccdid, ccd in self.ccds.items()
                     for qid, q in ccd.quadrants.items()]
+
+    # ======== #
+    #  Dask    #
+    # ======== #
+    def compute_all(self, headers=True, data=False, **kwargs):
+        """ computes the dasked headers (and/or data) of all quadrants at once.
+
+        Contrary to compute(), this uses a single dask.compute() call 
+        for all the quadrants.
+
+        Parameters
+        ----------
+        headers: bool
+            should the quadrant headers be computed ?
+
+        data: bool
+            should the quadrant data be computed ?
+            = careful this may load a lot of data in memory =
+
+        **kwargs goes to dask.compute(**kwargs)
+
+        Returns
+        -------
+        None
+        """
+        attrnames = (["_header"] if headers else []) + (["_data"] if data else [])
+        quadrants = [q for ccd in self.ccds.values() if ccd is not None
+                         for q in ccd.quadrants.values() if q is not None]
+        todo = [(q, attr) for q in quadrants for attr in attrnames
+                    if isinstance(getattr(q, attr, None), _DASK_TYPES)]
+        if len(todo) == 0:
+            return
+
+        computed = dask.compute(*[getattr(q, attr) for q, attr in todo], **kwargs)
+        _ = [setattr(q, attr, value) for (q, attr), value in zip(todo, computed)]
+
+        if data: # data changed, so may have use_dask
+            for q in quadrants:
+                q._use_dask = len(q._get_dasked_attributes_()) > 0
+            for ccd in self.ccds.values():
+                if ccd is not None:
+                    ccd._use_dask = any(q.use_dask for q in ccd._images if q is not None)
+            self._use_dask = any(ccd.use_dask for ccd in self.ccds.values() if ccd is not None)
     
     # -------- #
     #  GETTER  #
@@ -2520,10 +2665,13 @@ class FocalPlane(Image, _Collection_):
         if rcids in ["*", "all"]:
             rcids = np.arange(64)
 
-        hs = [self.get_quadrant(i).get_header() for i in rcids]
-        df = pandas.concat(hs, axis=1)
-        df.columns = rcids
-        return df
+        # dasked headers are all computed at once.
+        self.compute_all(headers=True, data=False)
+        hs = [dict(self.get_quadrant(i).get_header()) for i in rcids]
+        # single DataFrame construction (keys as index, rcids as columns)
+        keys = list(dict.fromkeys(k for h in hs for k in h))
+        data = {key: [h.get(key, np.NaN) for h in hs] for key in keys}
+        return pandas.DataFrame(data, index=rcids).T
 
     @staticmethod
     def _get_datagap(which, rebin=None, fillna=np.NaN):
@@ -2536,14 +2684,20 @@ class FocalPlane(Image, _Collection_):
             hpixels = CCD.SHAPE[0]
             vpixels = 488
 
-        if rebin is not None:
-            hpixels /= rebin
-            vpixels /= rebin
+        if rebin is not None: # pixels, so int
+            hpixels //= rebin
+            vpixels //= rebin
 
         return hpixels, vpixels
 
-    def get_data(self, rebin=None, incl_gap=True, persist=False, ccd_coef=None, **kwargs):
-        """ get data. """
+    def get_data(self, rebin=None, incl_gap=True, persist=False, ccd_coef=None,
+                     dtype=None, **kwargs):
+        """ get data. 
+
+        dtype: str, None
+            if given, the ccd data are cast to dtype before building 
+            the mosaic (e.g. float32 to halve its memory).
+        """
 
         if ccd_coef is None:
             ccd_coef = np.ones(16)
@@ -2556,91 +2710,35 @@ class FocalPlane(Image, _Collection_):
 
         npda = da if self.use_dask else np
 
+        ccddata = {ccdid: self.get_ccd(ccdid).get_data(**prop)*ccd_coef[ccdid-1]
+                   for ccdid in np.ravel(self._CCD_LAYOUT)}
+        if dtype is not None:
+            ccddata = {k: v.astype(dtype, copy=False) for k, v in ccddata.items()}
+
         if not incl_gap:
-            line_1 = getattr(npda, "concatenate")((self.get_ccd(4).get_data(**prop)*ccd_coef[3],
-                                                   self.get_ccd(3).get_data(**prop)*ccd_coef[2],
-                                                   self.get_ccd(2).get_data(**prop)*ccd_coef[1],
-                                                   self.get_ccd(1).get_data(**prop)*ccd_coef[0]
-                                                  ),
-                                                    axis=1)
-            
-            line_2 = getattr(npda, "concatenate")((self.get_ccd(8).get_data(**prop)*ccd_coef[7],
-                                                   self.get_ccd(7).get_data(**prop)*ccd_coef[6],
-                                                   self.get_ccd(6).get_data(**prop)*ccd_coef[5],
-                                                   self.get_ccd(5).get_data(**prop)*ccd_coef[4]
-                                                  ),
-                                                    axis=1)
-            
-            line_3 = getattr(npda, "concatenate")((self.get_ccd(12).get_data(**prop)*ccd_coef[11],
-                                                   self.get_ccd(11).get_data(**prop)*ccd_coef[10],
-                                                   self.get_ccd(10).get_data(**prop)*ccd_coef[9],
-                                                   self.get_ccd( 9).get_data(**prop)*ccd_coef[8]
-                                                   ),
-                                                    axis=1)
-            
-            line_4 = getattr(npda, "concatenate")((self.get_ccd(16).get_data(**prop)*ccd_coef[15],
-                                                   self.get_ccd(15).get_data(**prop)*ccd_coef[14],
-                                                   self.get_ccd(14).get_data(**prop)*ccd_coef[13],
-                                                   self.get_ccd(13).get_data(**prop)*ccd_coef[12]
-                                                    ),
-                                                    axis=1)
-
-            mosaic = getattr(npda, "concatenate")( (line_1, line_2, line_3, line_4),
-                                                    axis=0)
+            blocks = [[ccddata[ccdid] for ccdid in line] for line in self._CCD_LAYOUT]
             
         else:
-            line_1 = getattr(npda, "concatenate")((self.get_ccd(4).get_data(**prop)*ccd_coef[3],
-                                                    da.ones(self._get_datagap("columns", rebin=rebin))*np.NaN,
-                                                   self.get_ccd(3).get_data(**prop)*ccd_coef[2],
-                                                    da.ones(self._get_datagap("columns", rebin=rebin))*np.NaN,
-                                                   self.get_ccd(2).get_data(**prop)*ccd_coef[1],
-                                                    da.ones(self._get_datagap("columns", rebin=rebin))*np.NaN,
-                                                   self.get_ccd(1).get_data(**prop)*ccd_coef[0],
-                                                       ),
-                                                    axis=1)
-            
-            line_2 = getattr(npda, "concatenate")((self.get_ccd(8).get_data(**prop)*ccd_coef[7],
-                                                    da.ones(self._get_datagap("columns", rebin=rebin))*np.NaN,
-                                                   self.get_ccd(7).get_data(**prop)*ccd_coef[6],
-                                                    da.ones(self._get_datagap("columns", rebin=rebin))*np.NaN,
-                                                   self.get_ccd(6).get_data(**prop)*ccd_coef[5],
-                                                    da.ones(self._get_datagap("columns", rebin=rebin))*np.NaN,
-                                                   self.get_ccd(5).get_data(**prop)*ccd_coef[4]
-                                                    ),
-                                                    axis=1)
-            
-            line_3 = getattr(npda, "concatenate")((self.get_ccd(12).get_data(**prop)*ccd_coef[11],
-                                                    da.ones(self._get_datagap("columns", rebin=rebin))*np.NaN,
-                                                   self.get_ccd(11).get_data(**prop)*ccd_coef[10],
-                                                    da.ones(self._get_datagap("columns", rebin=rebin))*np.NaN,
-                                                   self.get_ccd(10).get_data(**prop)*ccd_coef[9],
-                                                    da.ones(self._get_datagap("columns", rebin=rebin))*np.NaN,
-                                                   self.get_ccd(9).get_data(**prop)*ccd_coef[8]
-                                                       ),
-                                                    axis=1)
+            # gaps are built once and used in every slot of the mosaic.
+            gap_col_shape = self._get_datagap("columns", rebin=rebin)
+            gap_row_height = self._get_datagap("rows", rebin=rebin)[0]
+            gap_col = npda.full(gap_col_shape, np.NaN, dtype="float32")
+            line_width = sum(ccddata[ccdid].shape[1] for ccdid in self._CCD_LAYOUT[0]
+                             ) + (len(self._CCD_LAYOUT[0])-1) * gap_col_shape[1]
+            gap_row = npda.full((gap_row_height, line_width), np.NaN, dtype="float32")
             
-            line_4 = getattr(npda, "concatenate")((self.get_ccd(16).get_data(**prop)*ccd_coef[15],
-                                                   da.ones(self._get_datagap("columns", rebin=rebin))*np.NaN,
-                                                   self.get_ccd(15).get_data(**prop)*ccd_coef[14],
-                                                   da.ones(self._get_datagap("columns", rebin=rebin))*np.NaN,
-                                                   self.get_ccd(14).get_data(**prop)*ccd_coef[13],
-                                                   da.ones(self._get_datagap("columns", rebin=rebin))*np.NaN,
-                                                   self.get_ccd(13).get_data(**prop)*ccd_coef[12]
-                                                    ),
-                                                    axis=1)
-            
-            size_shape = self._get_datagap("rows", rebin=rebin)[0]
-            mosaic = getattr(npda, "concatenate")((line_1,
-                                                   da.ones(
-                                                      (size_shape, line_1.shape[1]))*np.NaN,
-                                                   line_2,
-                                                   da.ones(
-                                                      (size_shape, line_1.shape[1]))*np.NaN,
-                                                   line_3,
-                                                   da.ones(
-                                                      (size_shape, line_1.shape[1]))*np.NaN,
-                                                   line_4),
-                                                    axis=0)
+            blocks = []
+            for i, line in enumerate(self._CCD_LAYOUT):
+                if i > 0:
+                    blocks.append([gap_row])
+                    
+                line_blocks = [ccddata[line[0]]]
+                for ccdid in line[1:]:
+                    line_blocks += [gap_col, ccddata[ccdid]]
+                blocks.append(line_blocks)
+
+        # single graph (dask) or single allocation (numpy) for the whole mosaic
+        mosaic = npda.block(blocks)
         if self.use_dask and persist:
             return mosaic.persist()
 
@@ -2649,6 +2747,28 @@ class FocalPlane(Image, _Collection_):
     # -------- #
     #  PLOTS   #
     # -------- #
+    def show(self, ax=None, colorbar=True, cax=None, apply=None,
+                 data=None,
+                 vmin="1", vmax="99",
+                 rebin=None, dtype="float32",
+                 **kwargs):
+        """ Show the focal plane data (imshow)
+
+        Same as Image.show() but the mosaic is directly built 
+        with the given dtype (see get_data()).
+
+        See also
+        --------
+        Image.show: show the image data
+        get_data: get the focal plane mosaic
+        """
+        if data is None:
+            data = self.get_data(rebin=rebin, dtype=dtype)
+            
+        return super().show(ax=ax, colorbar=colorbar, cax=cax, apply=apply,
+                            data=data, vmin=vmin, vmax=vmax,
+                            rebin=rebin, dtype=dtype, **kwargs)
+    
     def show_footprint(self, values="id", ax=None, 
                            level="quadrant", cmap="coolwarm",
                            vmin=None, vmax=None, 
@@ -2809,8 +2929,12 @@ class FocalPlane(Image, _Collection_):
 
     def has_ccds(self, logic="all"):
         """ test if (any/all see option) ccds are loaded. """
-        is_none = [v is not None for v in self.ccds.values()]
-        return getattr(np, logic)(is_none)
+        if logic == "all": # cached, reset by set_ccd
+            if getattr(self, "_all_ccds_loaded", None) is None:
+                self._all_ccds_loaded = all(v is not None for v in self.ccds.values())
+            return self._all_ccds_loaded
+        
+        return getattr(np, logic)([v is not None for v in self.ccds.values()])
 
     @property
     def _images(self):
@@ -273,7 +273,8 @@ def get_isolated(catdf, catdf_ref=None,
         (pandas or dask, depending on input catdf format)    
     """
 
-    if "dask" in str( type(catdf) ):
+    from ztfimg.utils.tools import _DASK_TYPES
+    if isinstance(catdf, _DASK_TYPES):
         d_iso = dask.delayed(get_isolated)(**locals())
         meta = pandas.DataFrame(columns=["isolated"], dtype=bool)
         dd = dask.dataframe.from_delayed(d_iso, meta)
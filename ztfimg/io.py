@@ -2,6 +2,7 @@
 """ I/O for ztfimg data. """
 
 import os
+from functools import lru_cache
 import pandas
 
 LOCALSOURCE = os.getenv('ZTFDATA',"./Data/")
@@ -15,12 +16,17 @@ def get_test_image():
     return sciimg, maskimg
 
 def get_nonlinearity_table():
-    """ get the nonlinearity table
+    """ get the nonlinearity table (file read once, a copy is returned)
 
     Returns
     -------
     DataFrame
     """
+    return _read_nonlinearity_table().copy()
+
+@lru_cache(maxsize=None)
+def _read_nonlinearity_table():
+    """ nonlinearity table as read from the file (cached, not to be modified) """
     from .utils.tools import ccdid_qid_to_rcid
 
     NONLINEARITY_FILE = os.path.join(PACKAGE_PATH, "data/ccd_amp_coeff_v2.txt")
@@ -1,16 +1,19 @@
 import os
+import re
+from functools import lru_cache
 from astropy.io import fits
 import numpy as np
 from scipy import stats
 import pandas
 import warnings
+import weakref
 import dask
 import dask.array as da
 
 from ztfquery import io
         
-from .utils.tools import fit_polynome, rebin_arr, parse_vmin_vmax, ccdid_qid_to_rcid, rcid_to_ccdid_qid
-from .base import Quadrant, CCD, FocalPlane
+from .utils.tools import fit_polynome, rebin_reduce, get_rebin_chunks, parse_vmin_vmax, ccdid_qid_to_rcid, rcid_to_ccdid_qid, _DASK_TYPES
+from .base import Quadrant, CCD, FocalPlane, _thread_map, _process_map
 from .io import get_nonlinearity_table
 
 from ztfsensors import pocket
@@ -19,12 +22,98 @@ from ztfsensors.correct import correct_pixels
 
 NONLINEARITY_TABLE = get_nonlinearity_table()
 
+# (64, 2) array of the (a, b) non-linearity parameters, indexed by rcid
+_NONLINEARITY_AB = NONLINEARITY_TABLE[["a","b"]].astype("float").reindex(range(64)).to_numpy()
+
+@lru_cache(maxsize=None)
+def _get_pocket_model(ccdid, qid):
+    """ pocket.PocketModel of the given quadrant (config read once per quadrant) """
+    pockelconfig = pocket.get_config(ccdid, qid).values[0]
+    return pocket.PocketModel(**pockelconfig)
+
+def _load_ccd(filename, ccdclass, **kwargs):
+    """ ccdclass.from_filename(filename, **kwargs) (picklable, for process pools) 
+
+    Quadrant headers are converted to plain fits.Header since the
+    CompImageHeader of compressed files cannot be unpickled.
+    """
+    ccd = ccdclass.from_filename(filename, **kwargs)
+    for quadrant in ccd.quadrants.values():
+        if quadrant is not None and quadrant.header is not None:
+            quadrant.set_header(fits.Header(quadrant.header))
+    return ccd
+
+_FILEFRACDAY_RE = re.compile(r"^\d{14}$")
+
+def _filefracday_to_local_rawdata(filefracday, ccdid="*"):
+    """ ztfquery.io.filefracday_to_local_rawdata with the filefracday
+    format (YYYYMMDDFFFFFF) checked first, so no directory is scanned for
+    an invalid one.
+    """
+    from ztfquery.io import filefracday_to_local_rawdata
+    if not _FILEFRACDAY_RE.match(str(filefracday)):
+        raise ValueError(f"filefracday must be formatted as YYYYMMDDFFFFFF, {filefracday} given")
+    return filefracday_to_local_rawdata(str(filefracday), ccdid=ccdid)
+
+@lru_cache(maxsize=4096)
+def _get_scifile_of_filename(filename, qid=None, source="local"):
+    """ cached ztfquery.buildurl.get_scifile_of_filename (lists returned as tuples) """
+    from ztfquery.buildurl import get_scifile_of_filename
+    scifile = get_scifile_of_filename(filename, qid=qid, source=source)
+    return tuple(scifile) if isinstance(scifile, list) else scifile
+
+# backend used to read raw data arrays: "astropy" or "fitsio" (optional, faster
+# decompression). Headers are always read with astropy.
+FITS_BACKEND = "astropy"
+
+# RawFocalPlane instances loaded by from_filefracday (weak references)
+_FILEFRACDAY_CACHE = weakref.WeakValueDictionary()
+
+# compressed raw files smaller than this (in bytes) are read in one go
+_BULKREAD_MAXSIZE = 200_000_000
+
+def _open_rawfile(filepath):
+    """ fits.open() of a raw file.
+
+    Compressed files (.fz) smaller than _BULKREAD_MAXSIZE are read at once
+    (large read blocks) into memory, others are memory mapped by astropy
+    when the format allows it (not scaled).
+    """
+    if str(filepath).endswith(".fz") and os.path.getsize(filepath) < _BULKREAD_MAXSIZE:
+        from io import BytesIO
+        with open(filepath, "rb", buffering=4*1024*1024) as file_:
+            return fits.open(BytesIO(file_.read()))
+
+    return fits.open(filepath)
+
+def _asfloat32(data):
+    """ data as float32 (no copy if already float32) """
+    return np.asarray(data, dtype="float32")
+
+def _read_hdu_data(hdul, ext):
+    """ data of the ext hdu of an opened astropy HDUList or fitsio FITS """
+    hdu = hdul[ext]
+    return hdu.read() if hasattr(hdu, "read") else hdu.data
+
 __all__ = ["RawQuadrant", "RawCCD", "RawFocalPlane"]
 
+# usual overscan stacking statistics (any other numpy method is accepted)
+_STACK_FUNCS = {"nanmedian": np.nanmedian, "nanmean": np.nanmean,
+                "median": np.median, "mean": np.mean}
+try: # optional, faster nan-aware reductions
+    import bottleneck
+    _STACK_FUNCS.update({"nanmedian": bottleneck.nanmedian, "nanmean": bottleneck.nanmean,
+                         "median": bottleneck.median})
+except ImportError:
+    pass
+
 
 class RawQuadrant( Quadrant ):
 
     SHAPE_OVERSCAN = 3080, 30
+    # (row, column) flips from raw to read: bottom for qid 3 and 4, left-right for 2 and 3
+    _READ_FLIPS = {1: (False, False), 2: (False, True),
+                   3: (True, True), 4: (True, False)}
     # "family"
     _CCDCLASS = "RawCCD"
     _FocalPlaneCLASS = "RawFocalPlane"
@@ -42,20 +131,94 @@ class RawQuadrant( Quadrant ):
             self.set_overscan(overscan)
 
 
+    @staticmethod
+    def _overscan_cache_path(filepath, qid, cachedir):
+        """ path, in cachedir, of the cached overscan of the qid quadrant of filepath.
+
+        The path depends on the full path, size and modification time of filepath,
+        so a replaced (e.g. re-downloaded) file does not use a former cache.
+        """
+        import hashlib
+        stat = os.stat(filepath)
+        key = f"{os.path.abspath(filepath)}:{stat.st_size}:{stat.st_mtime_ns}"
+        digest = hashlib.md5(key.encode()).hexdigest()
+        return os.path.join(cachedir, f"{os.path.basename(filepath)}_{digest}_q{qid}.npy")
+
     @classmethod
-    def _read_overscan(cls, filepath, ext, use_dask=True, persist=False):
-        """ assuming fits format. """
-        from astropy.io.fits import getdata
-        
+    def _read_overscan_hdu(cls, filepath, qid, hdul=None):
+        """ overscan of the qid quadrant.
+
+        If the ZTFIMG_OVERSCAN_CACHE environment variable is set, it is 
+        used as cache directory: the overscan is read from (or written to)
+        a .npy file there (see _overscan_cache_path).
+        hdul (opened filepath, astropy or fitsio) is used, if given, to avoid 
+        re-opening the file.
+        """
+        cachedir = os.getenv("ZTFIMG_OVERSCAN_CACHE", "")
+        cachepath = None
+        if cachedir:
+            cachepath = cls._overscan_cache_path(filepath, qid, cachedir)
+            if os.path.isfile(cachepath):
+                return np.load(cachepath, mmap_mode="c")
+
+        if hdul is None:
+            overscan = fits.getdata(filepath, ext=qid+4)
+        else:
+            overscan = _read_hdu_data(hdul, qid+4)
+
+        if cachepath is not None:
+            # written aside then renamed, so a cache file is never read half written.
+            tmppath = f"{cachepath[:-4]}.{os.getpid()}.tmp.npy"
+            try:
+                os.makedirs(cachedir, exist_ok=True)
+                np.save(tmppath, np.asarray(overscan))
+                os.replace(tmppath, cachepath)
+            except OSError: # not writable, no cache then.
+                pass
+
+        return overscan
+
+    @classmethod
+    def _read_quadrant_hdus(cls, filepath, qid):
+        """ data, header and overscan of the qid quadrant, opening the file once. 
+
+        if qid is a list, this returns a list of (data, header, overscan), one per qid.
+        Data are memory mapped (views of the file) when the file format allows it 
+        (i.e. not compressed nor scaled) ; small compressed files are read at once.
+        """
+        qids = np.atleast_1d(qid)
+        if FITS_BACKEND == "fitsio":
+            import fitsio
+            # astropy (lazy, no data read) only for the headers
+            with fits.open(filepath) as hdul, fitsio.FITS(filepath) as ffile:
+                hdus = [(_read_hdu_data(ffile, qid_), hdul[qid_].header,
+                         cls._read_overscan_hdu(filepath, qid_, hdul=ffile))
+                        for qid_ in qids]
+        else:
+            with _open_rawfile(filepath) as hdul:
+                hdus = [(hdul[qid_].data, hdul[qid_].header,
+                         cls._read_overscan_hdu(filepath, qid_, hdul=hdul))
+                        for qid_ in qids]
+
+        return hdus if np.ndim(qid) > 0 else hdus[0]
+
+    @classmethod
+    def _read_data_and_overscan(cls, filepath, qid, use_dask=False, persist=False):
+        """ data and overscan of the qid quadrant read together (file opened once) """
+        if isinstance(filepath, _DASK_TYPES):
+            use_dask = True
+
         if use_dask:
-            overscan = da.from_delayed(dask.delayed(getdata)(filepath, ext=ext+4),
-                                            shape=cls.SHAPE_OVERSCAN, dtype="float32")
+            hdus = dask.delayed(cls._read_quadrant_hdus)(filepath, qid)
+            data = da.from_delayed(hdus[0], shape=cls.SHAPE, dtype="float32"
+                                   ).rechunk( get_rebin_chunks(cls.SHAPE) )
+            overscan = da.from_delayed(hdus[2], shape=cls.SHAPE_OVERSCAN, dtype="float32")
             if persist:
-                overscan = overscan.persist()
-        else:
-            overscan = getdata(filepath, ext=ext+4)
-            
-        return overscan            
+                data, overscan = dask.persist(data, overscan)
+            return data, overscan
+
+        data, _, overscan = cls._read_quadrant_hdus(filepath, qid)
+        return data, overscan
 
     @classmethod
     def from_data(cls, data, header=None, overscan=None, **kwargs):
@@ -80,7 +243,7 @@ class RawQuadrant( Quadrant ):
         class instance
         """
         # the super knows overscan thanks to the kwargs passed to __init__
-        use_dask = "dask" in str( type(data))
+        use_dask = isinstance(data, _DASK_TYPES)
         return super().from_data(data, header=header, overscan=overscan,
                                  **kwargs)
     
@@ -132,11 +295,13 @@ class RawQuadrant( Quadrant ):
 
         meta = io.parse_filename(filename)
         filepath = cls._get_filepath(filename, as_path=as_path, use_dask=use_dask)
-        # data
-        data = cls._read_data(filepath, ext=qid, use_dask=use_dask, persist=persist)
-        header = cls._read_header(filepath, ext=qid, use_dask=dask_header, persist=persist)
-        # and overscan
-        overscan = cls._read_overscan(filepath, ext=qid, use_dask=use_dask, persist=persist)
+        # data, header and overscan from a single file opening
+        if use_dask:
+            data, overscan = cls._read_data_and_overscan(filepath, qid, use_dask=True,
+                                                             persist=persist)
+            header = cls._read_header(filepath, ext=qid, use_dask=dask_header, persist=persist)
+        else:
+            data, header, overscan = cls._read_quadrant_hdus(filepath, qid)
         
         this = cls(data, header=header, overscan=overscan, **kwargs)
         this._qid = qid
@@ -173,10 +338,9 @@ class RawQuadrant( Quadrant ):
         class instance
         
         """
-        from ztfquery.io import filefracday_to_local_rawdata
         ccdid, qid = rcid_to_ccdid_qid(rcid)
         
-        filename = filefracday_to_local_rawdata(filefracday, ccdid=ccdid)
+        filename = _filefracday_to_local_rawdata(filefracday, ccdid=ccdid)
         
         if len(filename)==0:
             raise IOError(f"No local raw data found for filefracday: {filefracday} and ccdid: {ccdid}")
@@ -215,15 +379,30 @@ class RawQuadrant( Quadrant ):
         if "_f.fits" in filepath:
             imgkeys += ["ILUM_LED", "ILUMWAVE", "ILUMPOWR"]
 
-        header  = fits.getheader(filepath, ext=qid)
-        if grab_imgkeys:
-            imgheader = fits.getheader(filepath, ext=0)
-            for key in imgkeys:
-                header.set(key, imgheader.get(key), imgheader.comments[key])
-            
-        del imgheader
+        # file opened once for both headers.
+        with fits.open(filepath) as hdul:
+            header = hdul[qid].header
+            keys, values = list(header.keys()), list(header.values())
+            if grab_imgkeys:
+                # single pass over the global header cards ; comments are not kept
+                # in the DataFrame so no Card is created (as header.set would do).
+                imgvalues = {card.keyword: card.value for card in hdul[0].header.cards
+                                if card.keyword in imgkeys}
+                position = {key: i for i, key in reversed(list(enumerate(keys)))}
+                newkeys = [key for key in imgkeys if key not in position]
+                for key in imgkeys:
+                    if key in position: # updated, like header.set()
+                        values[position[key]] = imgvalues[key]
+
+                # like header.set(), new keys go before the trailing commentary cards
+                end = len(keys)
+                while end > 0 and keys[end-1] in ("COMMENT", "HISTORY", ""):
+                    end -= 1
+                keys[end:end] = newkeys
+                values[end:end] = [imgvalues[key] for key in newkeys]
+
         # DataFrame to be able to dask it.
-        return pandas.DataFrame( pandas.Series(header) )
+        return pandas.DataFrame(values, index=keys)
 
     # -------- #
     #  SETTER  #
@@ -264,13 +443,28 @@ class RawQuadrant( Quadrant ):
         data and overscan
             array, (see stacked)
         """
-        # force reorder to False as this is sorted later on.
-        data = self._reorder_data(self.data, in_="raw", out_="read")
-        overscan = self._reorder_data(self.overscan, in_="raw", out_="read")
-        if stacked:
-            return self._np_backend.hstack([data, overscan])
-            
-        return data, overscan
+        # raw -> read directly from the flips table (nothing to do for qid 1)
+        flip_rows, flip_cols = self._READ_FLIPS[self.qid]
+        if flip_rows or flip_cols:
+            slice_ = (slice(None, None, -1 if flip_rows else 1),
+                      slice(None, None, -1 if flip_cols else 1))
+            data, overscan = self.data[slice_], self.overscan[slice_]
+        else:
+            data, overscan = self.data, self.overscan
+
+        if not stacked:
+            return data, overscan
+
+        if self._use_dask:
+            return self._to_float32(da.hstack([data, overscan]))
+
+        # reordered views copied directly into a float32 buffer
+        n_data = data.shape[1]
+        stacked_ = np.empty((data.shape[0], n_data + overscan.shape[1]),
+                            dtype="float32")
+        stacked_[:, :n_data] = data
+        stacked_[:, n_data:] = overscan
+        return stacked_
 
     def _reorder_data(self, data, in_="raw", out_="sky"):
         """ 
@@ -281,29 +475,19 @@ class RawQuadrant( Quadrant ):
         """
         if in_ == out_: # nothing to do
             return data
-        
-        # raw <-> sky
-        elif (in_ == "raw" and out_ == "sky") or (in_ == "sky" and out_ == "raw"):
-            data = data[::-1,::-1]
-
-        # raw <-> read            
-        elif (in_ == "raw" and out_ == "read") or (in_ == "read" and out_ == "raw"):
-            if self.qid in [2, 3]:
-                data = data[:,::-1]
 
-            # bottom for quadrants 3 and 4
-            if self.qid in [3, 4]:
-                data = data[::-1,:]
-                
-        elif (in_ == "sky" and out_ == "read") or (in_ == "read" and out_ == "sky"):
-            data_raw = self._reorder_data(data, in_=in_, out_="raw")
-            data = self._reorder_data(data_raw, in_="raw", out_=out_)
-            
-        else:
+        # (row, column) flips of each format with respect to raw
+        flips = {"raw": (False, False),
+                 "sky": (True, True),
+                 "read": self._READ_FLIPS[self.qid]}
+        if in_ not in flips or out_ not in flips:
             warnings.warn("cannot parse the input in_ and out_, nothing happens")
-            
-        return data
-        
+            return data
+
+        # in_ -> out_ = in_ -> raw -> out_ ; single slicing (view)
+        flip_rows, flip_cols = [in_flip != out_flip for in_flip, out_flip
+                                    in zip(flips[in_], flips[out_])]
+        return data[::-1 if flip_rows else 1, ::-1 if flip_cols else 1]
         
     def get_data(self,
                      corr_overscan=False,
@@ -362,19 +546,24 @@ class RawQuadrant( Quadrant ):
         # rebin is made later on.
         if not corr_pocket:
             data_ = super().get_data(rebin=None, reorder=False, **kwargs)
+            # corrections are made inplace, not on self.data
+            if corr_nl or corr_overscan:
+                data_ = self._to_float32(data_)
             
-        else:
+        else: # new array
             data_ = self.get_data_and_overscan(stacked=True)
             format_ = "read" # ordering format
             
         # correct non-linearity
         if corr_nl:
             a, b = self.get_nonlinearity_corr()
-            data_ /= (a*data_**2 + b*data_ + 1)
+            data_ = self._correct_nonlinearity(data_, a, b)
 
         # remove overscan            
         if corr_overscan:
             os_model = self.get_overscan( **{**dict(which="model"), **overscan_prop} )
+            if isinstance(data_, da.Array): # row chunks aligned with the data ones
+                os_model = da.asarray(os_model).rechunk({0: data_.chunks[0]})
             data_ -= os_model[:,None]            
 
         # Correction for the pocket effect
@@ -387,15 +576,16 @@ class RawQuadrant( Quadrant ):
 
             # this is not dask ready yet
             n_overscan = self.overscan.shape[1] # overscan pixels            
-            pockelconfig = pocket.get_config(self.ccdid, self.qid).values[0]
-            pockemodel = pocket.PocketModel(**pockelconfig)
+            pockemodel = _get_pocket_model(int(self.ccdid), int(self.qid))
+            if not self._use_dask: # single C-ordered float32 buffer
+                data_ = np.ascontiguousarray(data_, dtype="float32")
             data_and_overscan = correct_pixels(pockemodel, data_, n_overscan=n_overscan)
-            data_ = data_and_overscan[:,:-n_overscan]
+            data_ = data_and_overscan[:,:-n_overscan] # view
         
             
         if rebin is not None:
-            data_ = getattr(self._np_backend, rebin_stat)(
-                rebin_arr(data_, (rebin,rebin), use_dask=True), axis=(-2,-1) )
+            data_ = rebin_reduce(data_, (rebin, rebin), stat=rebin_stat,
+                                 use_dask=isinstance(data_, _DASK_TYPES))
 
         # make sure it is re-ordered
         if reorder:
@@ -403,6 +593,34 @@ class RawQuadrant( Quadrant ):
 
         return data_
 
+    @staticmethod
+    def _to_float32(data):
+        """ float32 version of data (a copy for numpy).
+
+        dask blocks are cast one by one since the meta dtype (float32) of 
+        the read data may differ from the on-disk one (e.g. uint16), 
+        so that dask's astype("float32") would do nothing.
+        """
+        if isinstance(data, _DASK_TYPES):
+            return data.map_blocks(_asfloat32, dtype="float32")
+        return data.astype("float32")
+
+    @staticmethod
+    def _correct_nonlinearity(data, a, b):
+        """ data/(a*data**2 + b*data +1) 
+
+        numpy data are corrected inplace using a single temporary array.
+        """
+        if isinstance(data, _DASK_TYPES):
+            return data/(a*data**2 + b*data + 1)
+
+        denom = a*data # (a*data + b)*data + 1
+        denom += b
+        denom *= data
+        denom += 1
+        data /= denom
+        return data
+
     def get_nonlinearity_corr(self):
         """ looks in the raw.NONLINEARITY_TABLE the the entry corresponding to the quadrant's rcid
         and returns the a and b parameters. 
@@ -414,9 +632,11 @@ class RawQuadrant( Quadrant ):
 
         Return
         ------
-        data
+        (float, float)
+            a and b
         """
-        return NONLINEARITY_TABLE.loc[self.rcid][["a","b"]].astype("float").values
+        a, b = _NONLINEARITY_AB[int(self.rcid)]
+        return float(a), float(b)
         
     def get_overscan(self, which="data", sigma_clipping=3,
                          userange=[20,30], stackstat="nanmedian",
@@ -473,6 +693,8 @@ class RawQuadrant( Quadrant ):
         Returns
         -------
         1 or 2d array (see which)
+            = raw and data are views of self.overscan if not corrected, 
+            do not modify them inplace =
 
         Examples
         --------
@@ -482,7 +704,7 @@ class RawQuadrant( Quadrant ):
             
         # raw (or data, that is cleaned raw)            
         if which in ["raw", "data"]:
-            data = self.overscan.copy()
+            data = self.overscan # view, copied only if corrected below.
             if which == "data":
                 # left-right inversion
                 # first overscan is self.get_overscan('data')[:,0]
@@ -493,11 +715,15 @@ class RawQuadrant( Quadrant ):
                     
             if userange is not None:
                 data = data[:, userange[0]:userange[1]]
+
+            # corrections are made inplace, not on self.overscan
+            if corr_nl or corr_overscan:
+                data = self._to_float32(data)
                     
             # correct for non linearity
             if corr_nl:
                 a, b = self.get_nonlinearity_corr()
-                data /= (a*data**2 + b*data + 1)
+                data = self._correct_nonlinearity(data, a, b)
                 
             # correct for overscan model
             if corr_overscan:
@@ -522,10 +748,12 @@ class RawQuadrant( Quadrant ):
                                         specaxis=specaxis)
             # dask
             if self._use_dask:                
-                d_ = dask.delayed(fit_polynome)(np.arange( len(spec) ), spec, degree=modeldegree)
+                d_ = dask.delayed(fit_polynome)(np.arange( len(spec) ), spec, degree=modeldegree
+                                                    ).astype("float32")
                 return da.from_delayed(d_, shape=spec.shape, dtype="float32")
             # numpy
-            return fit_polynome(np.arange(len(spec)), spec, degree=modeldegree)
+            # float32 like the data, so it does not upcast them.
+            return fit_polynome(np.arange(len(spec)), spec, degree=modeldegree).astype("float32")
         
         raise ValueError(f'which should be "raw", "data", "spec", "model", {which} given')    
 
@@ -556,7 +784,7 @@ class RawQuadrant( Quadrant ):
             numpy or dask depending on input data.
         """
 
-        if "dask" in str( type(data) ):
+        if isinstance(data, _DASK_TYPES):
             d_spec = dask.delayed(cls._get_overscan_spec_)(data,
                                                         sigma_clipping=sigma_clipping, 
                                                         stackstat=stackstat,
@@ -570,19 +798,15 @@ class RawQuadrant( Quadrant ):
             return spec
 
 
-        try:
-            from scipy.stats import median_abs_deviation as nmad # scipy>1.9
-        except:
-            from scipy.stats import median_absolute_deviation as nmad # scipy<1.9
-
         # numpy based
-        spec = getattr(np,stackstat)(data, axis=axis)
-        med_ = np.median( spec, axis=0)
+        stackfunc = _STACK_FUNCS[stackstat] if stackstat in _STACK_FUNCS else getattr(np, stackstat)
+        spec = stackfunc(data, axis=axis)
         if sigma_clipping is not None and sigma_clipping>0:
-            mad_  = nmad( spec, axis=0)
+            # absolute deviations computed once for both the mad and the clipping
+            absdev = np.abs(spec - np.median(spec, axis=0))
+            mad_ = np.median(absdev, axis=0) # = scipy.stats.median_abs_deviation
             # Symmetric to avoid bias, even though only positive outlier are expected.
-            flag_out = (spec>(med_+sigma_clipping*mad_)) +(spec<(med_-sigma_clipping*mad_))
-            spec[flag_out] = np.NaN
+            spec[absdev > sigma_clipping*mad_] = np.NaN
 
         return spec
 
@@ -643,9 +867,8 @@ class RawQuadrant( Quadrant ):
             use_dask = self.use_dask
             
         from .science import ScienceQuadrant
-        from ztfquery.buildurl import get_scifile_of_filename
         # 
-        filename = get_scifile_of_filename(self.filename, qid=self.qid, source="local")
+        filename = _get_scifile_of_filename(self.filename, qid=self.qid, source="local")
         return ScienceQuadrant.from_filename(filename, use_dask=use_dask, as_path=False, **kwargs)
     
     # -------- #
@@ -786,22 +1009,43 @@ class RawCCD( CCD ):
         >>> rawccd = ztfimg.RawCCD.from_filename("ztf_20220704387176_000695_zr_c11_o.fits.fz", as_path=False)
         """
         qids = (1,2,3,4)
-        
-        quadrant_from_filename = cls._quadrantclass.from_filename            
-        quadrants = [quadrant_from_filename(filename,
-                                            qid=qid,
-                                            as_path=as_path,
-                                            use_dask=use_dask,
-                                            persist=persist,
-                                            **kwargs)
-                         for qid in qids]
+        dask_header = kwargs.pop("dask_header", False) and use_dask
+        quadrantclass = cls._quadrantclass
+
+        meta = io.parse_filename(filename)
+        filepath = cls._get_filepath(filename, as_path=as_path, use_dask=use_dask)
+        # the file is opened (and decompressed) once for the 4 quadrants.
+        if use_dask:
+            hdus = dask.delayed(quadrantclass._read_quadrant_hdus)(filepath, list(qids))
+            datas = [da.from_delayed(hdus[i][0], shape=quadrantclass.SHAPE, dtype="float32"
+                                     ).rechunk( get_rebin_chunks(quadrantclass.SHAPE) )
+                     for i in range(len(qids))]
+            overscans = [da.from_delayed(hdus[i][2], shape=quadrantclass.SHAPE_OVERSCAN,
+                                         dtype="float32")
+                         for i in range(len(qids))]
+            if persist:
+                datas, overscans = dask.persist(datas, overscans)
+            headers = [quadrantclass._read_header(filepath, ext=qid, use_dask=dask_header,
+                                                  persist=persist)
+                       for qid in qids]
+        else:
+            datas, headers, overscans = zip(*quadrantclass._read_quadrant_hdus(filepath, list(qids)))
+
+        quadrants = []
+        for qid, data, header, overscan in zip(qids, datas, headers, overscans):
+            quadrant = quadrantclass(data, header=header, overscan=overscan, **kwargs)
+            quadrant._qid = qid
+            quadrant._filename = filename
+            quadrant._filepath = filepath
+            quadrant._meta = meta
+            quadrants.append(quadrant)
             
         this = cls.from_quadrants(quadrants, qids=qids)
         this._filename = filename
         if as_path:
             this._filepath = filename
             
-        this._meta = io.parse_filename(filename)
+        this._meta = meta
         return this
 
     @classmethod
@@ -852,8 +1096,7 @@ class RawCCD( CCD ):
         class instance
         
         """
-        from ztfquery.io import filefracday_to_local_rawdata
-        filename = filefracday_to_local_rawdata(filefracday, ccdid=ccdid)
+        filename = _filefracday_to_local_rawdata(filefracday, ccdid=ccdid)
         if len(filename)==0:
             raise IOError(f"No local raw data found for filefracday: {filefracday} and ccdid: {ccdid}")
         if len(filename)>1:
@@ -863,7 +1106,8 @@ class RawCCD( CCD ):
 
 
 
-    def get_sciimage(self, use_dask=None, qid=None, as_ccd=True, **kwargs):
+    def get_sciimage(self, use_dask=None, qid=None, as_ccd=True,
+                         sci_path_template=None, **kwargs):
         """ get the Science image corresponding to this raw image
         
         This uses ztfquery to parse the filename and set up the correct 
@@ -882,28 +1126,41 @@ class RawCCD( CCD ):
             should this return a list of science quadrant (False)
             or a ScienceCCD (True) ?
 
+        sci_path_template: str or None
+            science quadrant filepath with a {qid} field, e.g.
+            'path/ztf_20200924431759_000655_zr_c13_o_q{qid}_sciimg.fits'.
+            If None, self.sci_path_template is used (filename parsed by ztfquery).
+
         **kwargs goes to ScienceQuadrant.from_filename
 
         Returns
         -------
-        ScienceQuadrant
+        ScienceQuadrant, list of ScienceQuadrant or ScienceCCD
+            with use_dask, each quadrant is read (and decompressed) by its own 
+            delayed task, and the ScienceCCD data are a single dask.array 
+            (da.block of the quadrants): computing it, e.g. with
+            scheduler="threads", reads the 4 quadrants in parallel.
         """
         if use_dask is None:
             use_dask = self.use_dask
 
         from .science import ScienceQuadrant            
-        from ztfquery.buildurl import get_scifile_of_filename
         # Specific quadrant
-        prop = {"as_path":False}
+        prop = {**{"as_path":False}, **kwargs}
         
+        if sci_path_template is None:
+            sci_path_template = self.sci_path_template
+
         if qid is not None:
-            filename = get_scifile_of_filename(self.filename, qid=qid, source="local")
-            return ScienceQuadrant.from_filename(filename, use_dask=use_dask, **{**prop,**kwargs} )
+            filename = sci_path_template.format(qid=qid)
+            return ScienceQuadrant.from_filename(filename, use_dask=use_dask, **prop)
 
         # no quadrant given -> 4 filenames (qid = 1,2,3,4)
-        filenames = get_scifile_of_filename(self.filename, source="local")
-        quadrants = [ScienceQuadrant.from_filename(filename, use_dask=use_dask, **{**prop,**kwargs} )
-                    for filename in filenames]
+        filenames = [sci_path_template.format(qid=qid_) for qid_ in [1,2,3,4]]
+        # independent files: opened in parallel (threads)
+        quadrants = _thread_map(lambda filename: ScienceQuadrant.from_filename(filename, use_dask=use_dask,
+                                                                               **prop),
+                                filenames, max_workers=4)
         
         if as_ccd:
             from .science import ScienceCCD
@@ -912,6 +1169,18 @@ class RawCCD( CCD ):
         # If not, then list of science quadrants
         return quadrants
 
+    # =============== #
+    #  Properties     #
+    # =============== #
+    @property
+    def sci_path_template(self):
+        """ local science quadrant filepath of this ccd, with a {qid} field """
+        if not hasattr(self, "_sci_path_template"):
+            filepath = _get_scifile_of_filename(self.filename, qid=1, source="local")
+            head, tail = filepath.rsplit("_q1_", 1)
+            self._sci_path_template = head.replace("{", "{{").replace("}", "}}") + "_q{qid}_" + tail
+        return self._sci_path_template
+
     
 class RawFocalPlane( FocalPlane ):
     # INFORMATION || Numbers to be fine tuned from actual observations
@@ -925,7 +1194,7 @@ class RawFocalPlane( FocalPlane ):
     @classmethod
     def from_filenames(cls, filenames, as_path=True,
                            use_dask=False, persist=False,
-                           **kwargs):
+                           scheduler="threads", **kwargs):
         """ load the instance from the raw filename.
 
         Parameters
@@ -947,6 +1216,12 @@ class RawFocalPlane( FocalPlane ):
             = only applied if use_dask=True =
             should we use dask's persist() on data ?
 
+        scheduler: str, optional
+            = only applied if use_dask=False =
+            how are the ccd files loaded in parallel: 
+            - threads: pool of threads (I/O bound loading)
+            - processes: pool of processes (decompression bound loading)
+
         **kwargs: goes to _CCDCLASS.from_filename
         
         Returns
@@ -954,21 +1229,48 @@ class RawFocalPlane( FocalPlane ):
         class instance 
         
         """
+        if scheduler not in ["threads", "processes"]:
+            raise ValueError(f"scheduler must be 'threads' or 'processes', {scheduler} given")
+        
         this = cls()
-        for file_ in ccd_filenames:
-            ccd_ = cls._ccdclass.from_filename(file_, as_path=as_path,
-                                                   use_dask=use_dask, persist=persist,
-                                                   **kwargs)
+        if not use_dask: # all paths resolved at once, files then opened as paths
+            filepaths = cls._get_filepaths(filenames, as_path=as_path)
+            as_path_ = True
+        else: # get_file delayed per file
+            filepaths, as_path_ = filenames, as_path
+
+        # ccd files are independent: opened in parallel (threads)
+        # persist is made once for the whole focal plane (see below)
+        if scheduler == "processes" and not use_dask:
+            from functools import partial
+            ccds = _process_map(partial(_load_ccd, ccdclass=cls._ccdclass, as_path=as_path_,
+                                        use_dask=False, **kwargs),
+                                filepaths)
+        else:
+            ccds = _thread_map(lambda file_: cls._ccdclass.from_filename(file_, as_path=as_path_,
+                                                                         use_dask=use_dask, persist=False,
+                                                                         **kwargs),
+                               filepaths)
+        for ccd_ in ccds:
             this.set_ccd(ccd_, ccdid=ccd_.ccdid)
 
-        this._filenames = ccd_filenames
-        if as_path:
-            this._filepaths = ccd_filenames
+        if use_dask and persist: # single graph for all the quadrants
+            quadrants = [quad for ccd_ in ccds for quad in ccd_.quadrants.values()
+                             if quad is not None]
+            datas, overscans = dask.persist([quad.data for quad in quadrants],
+                                            [quad.overscan for quad in quadrants])
+            for quad, data, overscan in zip(quadrants, datas, overscans):
+                quad.set_data(data)
+                quad.set_overscan(overscan)
+
+        this._filenames = filenames
+        if as_path or not use_dask:
+            this._filepaths = filepaths
             
         return this
 
     @classmethod
-    def from_filefracday(cls, filefracday, use_dask=True, **kwargs):
+    def from_filefracday(cls, filefracday, use_dask=True, cache=False, **kwargs):
         """ load the instance given a filefracday and the ccidid (ztf ID)
 
         Parameters
@@ -985,6 +1287,12 @@ class RawFocalPlane( FocalPlane ):
             = only applied if use_dask=True =
             should we use dask's persist() on data ?
 
+        cache: bool
+            return the instance already loaded with the same inputs if it
+            still exists (weak reference, instances are not kept alive).
+            This instance is shared: changes made to it (e.g. set_data)
+            are seen by all callers.
+
         **kwargs goes to from_filenames -> _CCDCLASS.from_filename
 
         Returns
@@ -992,15 +1300,63 @@ class RawFocalPlane( FocalPlane ):
         class instance
         
         """
-        from ztfquery.io import filefracday_to_local_rawdata
-        filenames = filefracday_to_local_rawdata(filefracday, ccdid="*")
+        try:
+            key = (cls, str(filefracday), use_dask, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError: # unhashable options, no cache
+            cache = False
+
+        if cache and (this := _FILEFRACDAY_CACHE.get(key)) is not None:
+            return this
+
+        this = cls._from_filefracday(filefracday, use_dask=use_dask, **kwargs)
+        if cache:
+            _FILEFRACDAY_CACHE[key] = this
+        return this
+
+    @classmethod
+    def _from_filefracday(cls, filefracday, use_dask=True, **kwargs):
+        """ from_filefracday without cache """
+        filenames = _filefracday_to_local_rawdata(filefracday, ccdid="*")
         if len(filenames)==0:
             raise IOError(f"No local raw data found for filefracday: {filefracday}")
         
         if len(filenames)>16:
-            raise IOError(f"Very strange: more than 16 local raw data found for filefracday: {filefracday}", filename)
+            raise IOError(f"Very strange: more than 16 local raw data found for filefracday: {filefracday}", filenames)
         
         if len(filenames)<16:
             warnings.warn(f"Less than 16 local raw data found for filefracday: {filefracday}")
-        
+
+        # from_filenames opens (or fetches, if as_path=False) the ccd files in parallel
         return cls.from_filenames(filenames, use_dask=use_dask, **kwargs)
+
+    @classmethod
+    def from_filefracdays(cls, filefracdays, use_dask=True, max_workers=8, **kwargs):
+        """ load one instance per filefracday, exposures being loaded in parallel.
+
+        Parameters
+        ----------
+        filefracdays: list of str
+            ztf IDs of the exposures (YYYYMMDDFFFFFF) like 20220704387176
+
+        use_dask: bool
+            Should dask be used ? The data will not be loaded but delayed 
+            (dask.array)
+
+        max_workers: int
+            maximum number of exposures loaded at the same time (threads).
+
+        **kwargs goes to from_filefracday
+
+        Returns
+        -------
+        list
+            list of class instances (same order as filefracdays)
+
+        See also
+        --------
+        from_filefracday: load the instance given a filefracday
+        """
+        return _thread_map(lambda filefracday: cls.from_filefracday(filefracday, use_dask=use_dask,
+                                                                    **kwargs),
+                           filefracdays, max_workers=max_workers)
@@ -5,11 +5,12 @@ import numpy as np
 import dask
 import dask.array as da
 import dask.dataframe as dd
+from dask.delayed import Delayed
 import warnings
 from astropy.nddata import bitmask
 
 from .base import Quadrant, CCD, FocalPlane
-from .utils.tools import rebin_arr, parse_vmin_vmax, rcid_to_ccdid_qid, ccdid_qid_to_rcid
+from .utils.tools import rebin_reduce, parse_vmin_vmax, rcid_to_ccdid_qid, ccdid_qid_to_rcid, _DASK_TYPES
 from .utils.astrometry import WCSHolder
 
 
@@ -121,8 +122,8 @@ class ComplexImage( object ):
                                                     ignore_flags=flags, flip_bits=flip_bits)
         # Rebin
         if rebin is not None:
-            mask = getattr(da if self.use_dask else np, rebin_stat)(
-                rebin_arr(mask, (rebin, rebin), use_dask=self.use_dask), axis=(-2, -1))
+            mask = rebin_reduce(mask, (rebin, rebin), stat=rebin_stat,
+                                use_dask=self.use_dask)
 
         if reorder:
             #print("reorder mask")
@@ -157,7 +158,7 @@ class ComplexImage( object ):
         elif method in ["sep", "backgroundrms", "rms"]:
             sepbackground = self._get_sepbackound()
             noise = sepbackground.rms()
-            if "delayed" in str( type( noise )):
+            if isinstance(noise, Delayed):
                 noise = da.from_delayed(noise,
                                         shape=self.shape,
                                         dtype="float32")
@@ -197,7 +198,7 @@ class ComplexImage( object ):
             #print("using sep background")
             sepbackground = self._get_sepbackound()
             bkgd = sepbackground.back()
-            if "delayed" in str( type(bkgd) ):
+            if isinstance(bkgd, Delayed):
                 bkgd = da.from_delayed(bkgd, shape=self.SHAPE, dtype="float32")
 
         elif method == "median":
@@ -206,7 +207,7 @@ class ComplexImage( object ):
                 mask = self.get_mask(psfsources=True, sexsources=True)
                 data = self.get_data(rm_bkgd=False, apply_mask=mask)
                 
-            if "dask" in str( type(data) ):
+            if isinstance(data, _DASK_TYPES):
                 # median no easy to massively //
                 bkgd = data_.map_blocks(np.nanmedian)
             else:
@@ -349,12 +350,10 @@ class ScienceQuadrant(Quadrant, WCSHolder, ComplexImage):
                 
             # Getting the filenames
             # - Data
-            data = da.from_delayed(dask.delayed(fits.getdata)(filepath),
-                                   shape=cls.SHAPE, dtype="float32")
+            data = cls._read_data(filepath, use_dask=True, dtype="float32")
             header = dask.delayed(fits.getheader)(filepath)
             # - Mask
-            mask = da.from_delayed(dask.delayed(fits.getdata)(filepath_mask),
-                                   shape=cls.SHAPE, dtype="int16")
+            mask = cls._read_data(filepath_mask, use_dask=True, dtype="int16")
             if persist:
                 data = data.persist()
                 header = header.persist()
@@ -374,10 +373,10 @@ class ScienceQuadrant(Quadrant, WCSHolder, ComplexImage):
                 filepath_mask = filename_mask
 
                 
-            data = fits.getdata(filepath)
+            data = cls._read_data(filepath)
             header = fits.getheader(filepath)
             # - Mask
-            mask = fits.getdata(filepath_mask)
+            mask = cls._read_data(filepath_mask)
 
         # self
 
@@ -489,8 +488,8 @@ class ScienceQuadrant(Quadrant, WCSHolder, ComplexImage):
         if zp is not None:
             magzp = self.get_value("MAGZP")
             coef = 10 ** (-0.4*(magzp - zp)) # change zp system
-            if "delayed" in str( type( coef ) ):
-                if "dask" in str( type( data_ ) ):
+            if isinstance(coef, Delayed):
+                if isinstance(data_, _DASK_TYPES):
                     coef = da.from_delayed(coef, dtype="float32", shape=())
                 else: # means numpy data
                     coef = coef.compute()
@@ -499,8 +498,8 @@ class ScienceQuadrant(Quadrant, WCSHolder, ComplexImage):
 
         # rebin            
         if rebin is not None:
-            data_ = getattr(da if self.use_dask else np, rebin_stat)(
-                rebin_arr(data_, (rebin, rebin), use_dask=self.use_dask), axis=(-2, -1))
+            data_ = rebin_reduce(data_, (rebin, rebin), stat=rebin_stat,
+                                 use_dask=self.use_dask)
 
         return data_
 
@@ -875,7 +874,8 @@ class ScienceCCD(CCD, ComplexImage):
 
         
         # Step 2. get data
-        ccddata = self._quadrantdata_to_ccddata(zp=zp, **kwargs).copy()
+        # new array (built from the quadrants), so it can be modified inplace
+        ccddata = self._quadrantdata_to_ccddata(zp=zp, **kwargs)
         # background        
         if not rm_bkgd is False: # accepts array
             ccddata -= rm_bkgd
@@ -886,11 +886,9 @@ class ScienceCCD(CCD, ComplexImage):
 
         # Step 3: Rebin & persisting
         if rebin is not None:
-            npda = da if "dask" in str( type(ccddata) ) else np
-            ccddata = getattr(npda, rebin_stat)(rebin_arr(ccddata, (rebin, rebin),
-                                                        use_dask=self.use_dask),
-                                              axis=(-2, -1))
-        if "dask" in str( type(ccddata) ) and persist:
+            ccddata = rebin_reduce(ccddata, (rebin, rebin), stat=rebin_stat,
+                                   use_dask=isinstance(ccddata, _DASK_TYPES))
+        if isinstance(ccddata, _DASK_TYPES) and persist:
             ccddata = ccddata.persist()
 
         return ccddata
@@ -4,10 +4,14 @@ from astropy import constants
 import dask
 import dask.array as da
 import dask.dataframe as dd
+from dask.delayed import Delayed
 
-__all__ = ["extract_sources", "get_aperture",
+__all__ = ["extract_sources", "get_aperture", "get_fft_aperture",
            "ccdid_qid_to_rcid", "rcid_to_ccdid_qid"]
 
+# dask objects (dask.array, delayed, dask.dataframe), for isinstance checks
+_DASK_TYPES = (da.Array, Delayed, dd.DataFrame, dd.Series)
+
 
 def ccdid_qid_to_rcid(ccdid, qid):
     """ """
@@ -19,29 +23,28 @@ def rcid_to_ccdid_qid(rcid):
     ccdid  = int((rcid-(qid - 1))/4 +1)
     return ccdid,qid
 
+# rcid (0->63) lookup tables, for vectorized conversions
+_RCID_TO_CCDID, _RCID_TO_QID = np.asarray([rcid_to_ccdid_qid(rcid) for rcid in range(64)],
+                                          dtype="int8").T
+
 def fit_polynome(x, y, degree, variance=None):
-    """ """
-    from scipy.optimize import fmin
+    """ fit a Legendre polynomial (degree terms) of x to y and returns the model at x.
+
+    This is a linear least-squares solved directly ; NaNs in y (or variance) are ignored.
+    """
     from scipy.special import legendre
     
     xdata = (x-np.nanmin(x))/(np.nanmax(x)-np.nanmin(x))*2-1.
     basemodel = np.asarray([legendre(i)(xdata) for i in range(degree)])
-    
-    def get_model( parameters ):
-        """ """
-        return np.dot(basemodel.T, parameters.T).T
-    
-    def get_chi2( parameters ):
-        res = (y - get_model(parameters) )**2
-        if variance is not None:
-            res /= variance
-            
-        return np.nansum(res)
-        
-    guess = np.zeros(degree)
-    guess[0] = np.nanmedian(y)
-    param = fmin(get_chi2, guess, disp=0)
-    return get_model(param)
+
+    y = np.asarray(y, dtype="float64")
+    weights = np.ones_like(y) if variance is None else \
+              np.broadcast_to(1/np.sqrt(variance), y.shape)
+    # nan entries do not contribute to the chi2
+    valid = np.isfinite(y) & np.isfinite(weights)
+    param = np.linalg.lstsq(basemodel[:, valid].T * weights[valid, None],
+                            y[valid] * weights[valid], rcond=None)[0]
+    return np.dot(basemodel.T, param)
 
 
 def rebin_arr(arr, bins, use_dask=False):
@@ -53,6 +56,74 @@ def rebin_arr(arr, bins, use_dask=False):
         return da.moveaxis(ccd_bins, 1,2)
     return np.moveaxis(ccd_bins, 1,2)
 
+def get_rebin_chunks(shape, nchunks=4, rebin=8):
+    """ dask chunks of about shape/nchunks per axis that are multiple of rebin.
+
+    For each axis, the chunk size is the largest divisor of the axis length
+    that is a multiple of rebin and not larger than length/nchunks,
+    so chunks are all the same size and any rebin dividing rebin
+    (e.g. 2, 4, 8) is made within the chunks.
+    Falls back to length/nchunks when no such divisor exists.
+
+    Parameters
+    ----------
+    shape: (int, int)
+        shape of the array to chunk.
+
+    nchunks: int
+        minimum number of chunks per axis.
+
+    rebin: int
+        chunk sizes are multiple of this.
+
+    Returns
+    -------
+    tuple
+        chunk size per axis.
+    """
+    chunks = []
+    for size in shape:
+        sizes = [k for k in range(rebin, size//nchunks+1, rebin) if size % k == 0]
+        chunks.append(sizes[-1] if len(sizes)>0 else size//nchunks)
+    return tuple(chunks)
+
+def rebin_reduce(arr, bins, stat="nanmean", use_dask=False):
+    """ rebin the last two axes of arr by bins and reduce each bin using stat.
+
+    This is equivalent to ``getattr(np, stat)(rebin_arr(arr, bins), axis=(-2,-1))``
+    but the binning is a reshaped view of the input (no ravel copy, no moveaxis),
+    so the reduction is made in a single pass.
+
+    Parameters
+    ----------
+    arr: array
+        numpy or dask array (at least 2d).
+        The last two axes shape must be multiple of bins.
+
+    bins: int, (int, int)
+        size of the bins along the last two axes.
+
+    stat: str
+        numpy (dask.array) reduction method (e.g. mean, nanmean, median)
+
+    use_dask: bool
+        is arr a dask array ?
+
+    Returns
+    -------
+    array
+        numpy or dask array (see use_dask)
+    """
+    bin_y, bin_x = np.broadcast_to(bins, 2)
+    if use_dask:
+        # block-wise reduction ; handles non-aligned chunks.
+        axes = {arr.ndim-2: bin_y, arr.ndim-1: bin_x}
+        return da.coarsen(getattr(np, stat), arr, axes)
+
+    *lead, ny, nx = np.shape(arr)
+    binned = np.reshape(arr, (*lead, ny//bin_y, bin_y, nx//bin_x, bin_x))
+    return getattr(np, stat)(binned, axis=(-3, -1))
+
 def parse_vmin_vmax(data, vmin, vmax):
     """ Parse the input vmin vmax given the data.\n    
     If float or int given, this does nothing \n
@@ -78,34 +149,158 @@ def parse_vmin_vmax(data, vmin, vmax):
     if vmax is None: vmax="99"
     if vmin is None: vmin = "1"
 
-    data = np.asarray(data, dtype="float32")
-    if type(vmax) == str:
-        vmax=np.nanpercentile(data, float(vmax))
-        
-    if type(vmin) == str:
-        vmin=np.nanpercentile(data, float(vmin))
+    # both percentiles from a single (partition based) call
+    percents = {k: float(v) for k, v in dict(vmin=vmin, vmax=vmax).items()
+                    if type(v) == str}
+    if len(percents) > 0:
+        data = np.asarray(data, dtype="float32")
+        values = dict(zip(percents, np.nanpercentile(data, list(percents.values()))))
+        vmin = values.get("vmin", vmin)
+        vmax = values.get("vmax", vmax)
         
     return vmin, vmax
 
 def get_aperture(data, x0, y0, radius, err=None, mask=None,
-                         bkgann=None, subpix=0, use_dask=False, **kwargs ):
+                         bkgann=None, subpix=0, use_dask=False,
+                         backend="sep", out=None, **kwargs ):
     """ 
+
+    Parameters
+    ----------
+    backend: str
+        - sep: exact pixel overlap using sep.sum_circle
+        - fft: aperture sums from a Fourier space convolution (see get_fft_aperture)
+        - auto: fft if many sources (>200) share few radii (<=8) and no bkgann, sep otherwise.
+
+    out: array, None
+        = ignored if use_dask =
+        array of the output shape where the results are stored 
+        (e.g. to reuse it when looping over images with the same sources).
+
     Returns
     -------
     (dask)array 
     (counts, counterr, flag) of size (3, len(radius), len(x0))
     """
     if use_dask:
-        return da.from_delayed( dask.delayed(get_aperture)(data, x0, y0, radius),
+        if out is not None:
+            raise ValueError("out cannot be used with use_dask=True")
+        return da.from_delayed( dask.delayed(get_aperture)(data, x0, y0, radius,
+                                                             err=err, mask=mask, bkgann=bkgann,
+                                                             subpix=subpix, backend=backend,
+                                                             **kwargs),
                                         shape=(3, radius.size, x0.size), dtype="float"
                                   )
     
+    if backend == "auto":
+        use_fft = np.size(x0) > 200 and np.size(radius) <= 8 and bkgann is None
+        backend = "fft" if use_fft else "sep"
+
+    if backend == "fft":
+        apdata = get_fft_aperture(data, x0, y0, radius, err=err, mask=mask)
+        if out is None:
+            return apdata
+        out[...] = apdata
+        return out
+
+    if backend != "sep":
+        raise ValueError(f"backend should be 'sep', 'fft' or 'auto' ; {backend} given")
     
     from sep import sum_circle
-    out = sum_circle(data.astype("float32"), np.atleast_1d(x0), np.atleast_1d(y0), radius,
-                         err=err, mask=mask, bkgann=bkgann, subpix=subpix,
-                         **kwargs)
-    return np.asarray(out)
+    # contiguous float64 buffers (no object-dtype path for pandas inputs)
+    x0 = np.ascontiguousarray(np.atleast_1d(x0), dtype="float64")
+    y0 = np.ascontiguousarray(np.atleast_1d(y0), dtype="float64")
+    radius = np.asarray(radius, dtype="float64")
+    # sep's C backend requires native float32 C-array ; copy only if needed.
+    data = np.ascontiguousarray(data, dtype="float32")
+    apdata = sum_circle(data, x0, y0, radius,
+                            err=err, mask=mask, bkgann=bkgann, subpix=subpix,
+                            **kwargs)
+    if out is None:
+        return np.asarray(apdata)
+
+    # fill the given buffer rather than stacking into a new one.
+    for out_, apdata_ in zip(out, apdata):
+        out_[...] = apdata_
+    return out
+
+def get_fft_aperture(data, x0, y0, radius, err=None, mask=None, order=3):
+    """ circular aperture sums computed in Fourier space.
+
+    The image is convolved once per radius with a disk (whose Fourier 
+    transform is 2 pi r J1(k r) / k) and the convolved image is 
+    interpolated at the source positions. The cost is dominated by one FFT 
+    of the image, so this is much faster than sep when many sources share 
+    the same few radii. Image edges are zero-padded by the largest radius.
+    Sums are band-limited approximations of the exact pixel overlap of sep 
+    (a few percent for radii of a couple of pixels, better for larger ones).
+
+    Parameters
+    ----------
+    data: 2d-array
+        image. NaN are set to 0.
+
+    x0, y0: 1d-array
+        source pixel coordinates.
+
+    radius: float, array
+        aperture radius (radii).
+
+    err: 2d-array, float, None
+        error image (or global error) ; errors are 0 if None.
+
+    mask: 2d-array, None
+        pixels set to True are ignored.
+
+    order: int
+        spline order of the interpolation at the source positions
+        (see scipy.ndimage.map_coordinates)
+
+    Returns
+    -------
+    array
+    (counts, counterr, flag) of size (3, len(radius), len(x0)) ; flags are 0.
+    """
+    from scipy import fft, special, ndimage
+
+    x0 = np.atleast_1d(np.asarray(x0, dtype="float64"))
+    y0 = np.atleast_1d(np.asarray(y0, dtype="float64"))
+    radii = np.atleast_1d(np.asarray(radius, dtype="float64")).ravel()
+    if np.ndim(radius) < 2 and radii.size > 1:
+        raise ValueError("for multiple radii, radius must be given as radius[:,None]")
+    pad = int(np.ceil(radii.max())) + 1
+
+    def _prepare(image):
+        image = np.nan_to_num(np.asarray(image, dtype="float64"))
+        if mask is not None:
+            image = np.where(mask, 0, image)
+        return np.pad(image, pad)
+
+    images = [_prepare(data)]
+    if err is not None:
+        images.append(_prepare(np.broadcast_to(err, np.shape(data))**2)) # variance
+
+    # FFT of the image (and variance) computed once for all radii.
+    shape = images[0].shape
+    fimages = [fft.rfft2(image_, workers=-1) for image_ in images]
+    k = 2*np.pi*np.hypot(fft.fftfreq(shape[0])[:,None], fft.rfftfreq(shape[1])[None,:])
+    coords = [y0 + pad, x0 + pad]
+
+    out = np.zeros((3, radii.size, x0.size))
+    for i, r_ in enumerate(radii):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            kernel = 2*np.pi*r_*special.j1(k*r_)/k
+        kernel[0, 0] = np.pi*r_**2
+        
+        sums = [ndimage.map_coordinates(fft.irfft2(fimage_*kernel, s=shape, workers=-1),
+                                        coords, order=order, mode="nearest")
+                for fimage_ in fimages]
+        out[0, i] = sums[0]
+        if err is not None:
+            out[1, i] = np.sqrt(np.clip(sums[1], 0, None))
+
+    # same format as sep.sum_circle
+    return out if np.ndim(radius) > 1 else out[:, 0]
 
 def extract_sources(data, thresh_=2, err=None, mask=None, use_dask=False, **kwargs):
         """ uses sep.extract to extract sources 'a la Sextractor' """
@@ -130,7 +325,7 @@ def extract_sources(data, thresh_=2, err=None, mask=None, use_dask=False, **kwar
         # No Dask
         #
         from sep import extract
-        sout = extract(data.astype("float32"),
+        sout = extract(np.ascontiguousarray(data, dtype="float32"),
                         thresh_, err=err, mask=mask, **kwargs)
 
         return pandas.DataFrame(sout)